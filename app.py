@@ -1,22 +1,117 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
+import time
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 # Import custom modules
 from modules.data_fetcher import (
     fetch_option_chain, 
-    get_available_expiries,
+    get_symbol_info,
+    get_live_spot_price,
     get_index_quote,
     get_market_status
 )
-from modules.gex_calculator import calculate_gex, find_gamma_levels
-from modules.visualizations import (
-    plot_gex_profile, 
-    plot_spot_gex_levels, 
-    plot_oi_analysis,
-    plot_pcr_analysis
+from modules.utils import (
+    get_atm_strike, format_number, format_numbers, filter_strikes, decimate_strikes, dynamic_ttl
 )
-from modules.utils import get_atm_strike, format_number, filter_strikes
+from modules.styles import CUSTOM_CSS, MARKET_CARD_TEMPLATE
+
+
+# Cached data wrappers - Streamlit reruns the whole script on every widget
+# change, so network calls are memoized per argument set for a short TTL
+# The chain is keyed on a time bucket from dynamic_ttl(): 5s during market
+# hours so every 30s poll sees fresh data, an hour off-hours when OI is static
+@st.cache_data(ttl=3600, max_entries=64, show_spinner=False)
+def _cached_option_chain(symbol, expiry_date, is_index=True, token=None, ttl_bucket=0):
+    return fetch_option_chain(symbol, expiry_date, is_index, token=token)
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_spot_price(symbol):
+    return get_live_spot_price(symbol)
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_index_quote(symbol):
+    return get_index_quote(symbol)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_market_status():
+    return get_market_status()
+
+@st.cache_data(show_spinner=False)
+def _cached_filter(df, spot_price, strike_range):
+    return filter_strikes(df, spot_price, strike_range)
+
+def _hash_frame(df):
+    """Content hash of every row, used as the cache key for option chains"""
+    return pd.util.hash_pandas_object(df).to_numpy().tobytes()
+
+@st.cache_data(show_spinner="Calculating GEX...", hash_funcs={pd.DataFrame: _hash_frame})
+def _cached_gex(df, spot_price, expiry_date, risk_free_rate):
+    from modules.gex_calculator import calculate_gex, find_gamma_levels
+    
+    gex_df = calculate_gex(df, spot_price, expiry_date, risk_free_rate)
+    call_sum, put_sum, total_sum = gex_df[['call_gex', 'put_gex', 'total_gex']].to_numpy().sum(axis=0)
+    gex_sums = {'call_gex': call_sum, 'put_gex': put_sum, 'total_gex': total_sum}
+    return gex_df, find_gamma_levels(gex_df, spot_price), gex_sums
+
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: _hash_frame})
+def _cached_oi_totals(df):
+    oi_by_type = df.groupby('type', sort=False, observed=True)['oi'].sum()
+    total_call_oi = oi_by_type.get('CE', 0)
+    total_put_oi = oi_by_type.get('PE', 0)
+    overall_pcr = np.divide(total_put_oi, total_call_oi, out=np.zeros(1), where=total_call_oi > 0)[0]
+    return total_call_oi, total_put_oi, overall_pcr
+
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: _hash_frame})
+def _cached_csv(df):
+    return df.to_csv(index=False).encode('utf-8')
+
+def _load_option_chain(symbol, expiry_date, is_index, token=None):
+    """Fetch the option chain and spot price, with compact dtypes applied"""
+    ttl_bucket = int(time.time() // dynamic_ttl())
+    df, spot = _cached_option_chain(symbol, expiry_date, is_index, token, ttl_bucket)
+    if spot is None:
+        spot = _cached_spot_price(symbol)
+    
+    if df is None or df.empty or spot is None:
+        return None, None
+    
+    # Sorted strikes let filter_strikes slice by binary search
+    df = df.sort_values('strike', kind='stable', ignore_index=True)
+    
+    # Compact numeric dtypes for the groupbys downstream ('type' is already categorical)
+    if (df['strike'] % 1 == 0).all():
+        df['strike'] = df['strike'].astype('int32')
+    df['oi'] = pd.to_numeric(df['oi'], downcast='integer')
+    return df, spot
+
+REFRESH_SECONDS = 30
+
+@st.fragment(run_every=REFRESH_SECONDS)
+def _live_refresh():
+    """Poll the last fetched chain and rerun the app only when it changed"""
+    symbol, expiry_date, is_index, token = st.session_state.fetch_params
+    
+    # The fragment body also runs on every full rerun; only poll on timer ticks
+    # (a few seconds of slack so tick jitter never skips one)
+    now = time.time()
+    if now - st.session_state.last_poll < REFRESH_SECONDS - 5:
+        df = None
+    else:
+        st.session_state.last_poll = now
+        df, spot = _load_option_chain(symbol, expiry_date, is_index, token)
+    
+    if df is not None and (spot != st.session_state.spot_price or not df.equals(st.session_state.options_df)):
+        st.session_state.options_df = df
+        st.session_state.spot_price = spot
+        st.session_state.last_update = datetime.now()
+        st.rerun()
+    
+    st.markdown('<span class="live-indicator"></span> Live Data', unsafe_allow_html=True)
+    st.caption(f"🕐 Updated: {st.session_state.last_update.strftime('%H:%M:%S')}")
+    st.caption(f"📊 {symbol} Spot: ₹{st.session_state.spot_price:,.2f}")
 
 # Page configuration
 st.set_page_config(
@@ -27,36 +122,7 @@ st.set_page_config(
 )
 
 # Custom CSS
-st.markdown("""
-    <style>
-    .main-header {
-        font-size: 2.5rem;
-        font-weight: bold;
-        color: #1f77b4;
-        text-align: center;
-        margin-bottom: 1rem;
-    }
-    .metric-card {
-        background-color: #f0f2f6;
-        padding: 1rem;
-        border-radius: 0.5rem;
-        margin: 0.5rem 0;
-    }
-    .live-indicator {
-        display: inline-block;
-        width: 10px;
-        height: 10px;
-        background-color: #22c55e;
-        border-radius: 50%;
-        margin-right: 5px;
-        animation: pulse 2s infinite;
-    }
-    @keyframes pulse {
-        0%, 100% { opacity: 1; }
-        50% { opacity: 0.5; }
-    }
-    </style>
-""", unsafe_allow_html=True)
+st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
 
 # Initialize session state
 if 'data_loaded' not in st.session_state:
@@ -67,6 +133,14 @@ if 'spot_price' not in st.session_state:
     st.session_state.spot_price = None
 if 'last_update' not in st.session_state:
     st.session_state.last_update = None
+if 'gex_sums' not in st.session_state:
+    st.session_state.gex_sums = None
+if 'fetch_params' not in st.session_state:
+    st.session_state.fetch_params = None
+if 'last_poll' not in st.session_state:
+    st.session_state.last_poll = 0.0
+if 'figures' not in st.session_state:
+    st.session_state.figures = {}
 
 # Header
 st.markdown('<p class="main-header">📊 GEX Analyzer</p>', unsafe_allow_html=True)
@@ -85,7 +159,10 @@ with st.sidebar:
         symbol = st.text_input("Enter Stock Symbol (e.g., RELIANCE)", "RELIANCE").upper()
     
     if symbol:
-        available_expiries = get_available_expiries(symbol, is_index)
+        token, available_expiries = get_symbol_info(symbol, is_index)
+        if not available_expiries:
+            # Don't pin a failed lookup for the day-long cache lifetime
+            get_symbol_info.clear(symbol, is_index)
         
         if available_expiries:
             st.success("✅ Connected to Data Source")
@@ -96,10 +173,12 @@ with st.sidebar:
             
             if st.button("🔄 Fetch Data", type="primary", use_container_width=True):
                 with st.spinner("Fetching data from Sensibull..."):
-                    df, spot = fetch_option_chain(symbol, expiry_date, is_index)
+                    df, spot = _load_option_chain(symbol, expiry_date, is_index, token)
                     
-                    if df is not None and not df.empty and spot is not None:
+                    if df is not None:
                         st.session_state.options_df = df
+                        st.session_state.fetch_params = (symbol, expiry_date, is_index, token)
+                        st.session_state.last_poll = time.time()
                         st.session_state.spot_price = spot
                         st.session_state.data_loaded = True
                         st.session_state.last_update = datetime.now()
@@ -114,20 +193,159 @@ with st.sidebar:
     
     if st.session_state.data_loaded and st.session_state.last_update:
         st.markdown("---")
-        st.markdown('<span class="live-indicator"></span> Live Data', unsafe_allow_html=True)
-        st.caption(f"🕐 Updated: {st.session_state.last_update.strftime('%H:%M:%S')}")
-        st.caption(f"📊 {symbol} Spot: ₹{st.session_state.spot_price:,.2f}")
+        _live_refresh()
+
+def _chain_figure(name, chain_key, build, update):
+    """
+    Reuse this session's figure for the same chain and only swap in new data
+    
+    Streamlit diffs an updated figure under a stable chart key client-side,
+    so refreshes don't tear down and rebuild the whole chart.
+    """
+    cached = st.session_state.figures.get(name)
+    if cached is not None and cached[0] == chain_key:
+        fig = update(cached[1])
+    else:
+        fig = build()
+        st.session_state.figures[name] = (chain_key, fig)
+    fig.update_layout(uirevision=f"{chain_key[0]}-{chain_key[1]}")
+    return fig
+
+# Fragment renderers - each panel reruns on its own widget interactions
+# instead of re-executing the whole script
+@st.fragment
+def _render_gex_tab(gex_df, spot_price, gamma_levels, symbol, expiry_date):
+    from modules.visualizations import (
+        plot_gex_profile, update_gex_profile, plot_spot_gex_levels, update_spot_gex_levels
+    )
+    
+    st.subheader("Gamma Exposure Profile")
+    # Very wide chains keep only the strikes with the largest |GEX| for the bars
+    gex_bars = decimate_strikes(gex_df)
+    fig_gex = _chain_figure(
+        'gex_profile', (symbol, expiry_date),
+        lambda: plot_gex_profile(gex_bars, spot_price, gamma_levels),
+        lambda fig: update_gex_profile(fig, gex_bars, spot_price, gamma_levels)
+    )
+    st.plotly_chart(fig_gex, use_container_width=True, key="gex_profile_chart")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("##### 🎯 Key Levels")
+        st.write(f"**Support Level:** ₹{gamma_levels.get('support', 'N/A'):,}")
+        st.write(f"**Resistance Level:** ₹{gamma_levels.get('resistance', 'N/A'):,}")
+        st.write(f"**ATM Strike:** ₹{get_atm_strike(spot_price, strikes=gex_df['strike'].to_numpy()):,}")
+    with col2:
+        gex_sums = st.session_state.gex_sums
+        call_text, put_text, net_text = format_numbers(
+            [gex_sums['call_gex'], gex_sums['put_gex'], gex_sums['total_gex']]
+        )
+        st.markdown("##### 📊 GEX Summary")
+        st.write(f"**Total Call GEX:** {call_text}")
+        st.write(f"**Total Put GEX:** {put_text}")
+        st.write(f"**Net GEX:** {net_text}")
+    
+    st.markdown("---")
+    st.subheader("Net GEX vs Spot Movement")
+    fig_spot_gex = _chain_figure(
+        'spot_gex', (symbol, expiry_date),
+        lambda: plot_spot_gex_levels(gex_df, spot_price, gamma_levels, price_range=500),
+        lambda fig: update_spot_gex_levels(fig, gex_df, spot_price, gamma_levels, price_range=500)
+    )
+    st.plotly_chart(fig_spot_gex, use_container_width=True, key="spot_gex_chart")
+
+@st.fragment
+def _render_oi_tab(df_filtered, spot_price, symbol, expiry_date):
+    from modules.visualizations import (
+        plot_oi_analysis, update_oi_analysis, plot_pcr_analysis, update_pcr_analysis
+    )
+    
+    st.subheader("Open Interest Analysis")
+    oi_bars = decimate_strikes(df_filtered, key='oi')
+    fig_oi = _chain_figure(
+        'oi', (symbol, expiry_date),
+        lambda: plot_oi_analysis(oi_bars, spot_price),
+        lambda fig: update_oi_analysis(fig, oi_bars, spot_price)
+    )
+    st.plotly_chart(fig_oi, use_container_width=True, key="oi_chart")
+    
+    st.markdown("---")
+    st.subheader("Put-Call Ratio (PCR) Analysis")
+    fig_pcr = _chain_figure(
+        'pcr', (symbol, expiry_date),
+        lambda: plot_pcr_analysis(df_filtered),
+        lambda fig: update_pcr_analysis(fig, df_filtered)
+    )
+    st.plotly_chart(fig_pcr, use_container_width=True, key="pcr_chart")
+    
+    total_call_oi, total_put_oi, overall_pcr = _cached_oi_totals(df_filtered[['type', 'oi']])
+    
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Total Call OI", f"{total_call_oi:,.0f}")
+    col2.metric("Total Put OI", f"{total_put_oi:,.0f}")
+    col3.metric("Overall PCR", f"{overall_pcr:.2f}")
+
+@st.fragment
+def _render_data_tab(gex_df, symbol, expiry_date):
+    st.subheader("GEX Data Table")
+    display_df = gex_df.style.format({
+        'call_gex': '{:,.0f}',
+        'put_gex': '{:,.0f}',
+        'total_gex': '{:,.0f}'
+    })
+    
+    st.dataframe(display_df, use_container_width=True, height=400)
+    
+    csv = _cached_csv(gex_df)
+    st.download_button(
+        label="📥 Download GEX Data (CSV)",
+        data=csv,
+        file_name=f"gex_data_{symbol}_{expiry_date}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+        mime="text/csv"
+    )
+
+@st.fragment
+def _render_market_levels():
+    st.subheader("📈 Current Market Levels")
+    col1, col2 = st.columns(2)
+    
+    # Independent lookups, fetch concurrently instead of back to back
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        nifty_future = executor.submit(_cached_index_quote, 'NIFTY')
+        banknifty_future = executor.submit(_cached_index_quote, 'BANKNIFTY')
+        market_status_future = executor.submit(_cached_market_status)
+    nifty_quote = nifty_future.result()
+    banknifty_quote = banknifty_future.result()
+    
+    with col1:
+        st.markdown(MARKET_CARD_TEMPLATE.format_map({
+            'gradient': 'linear-gradient(135deg, #667eea 0%, #764ba2 100%)',
+            'title': 'NIFTY 50',
+            'value': f"₹{nifty_quote['last']:,.2f}" if nifty_quote else "Awaiting API Connection..."
+        }), unsafe_allow_html=True)
+        
+    with col2:
+        st.markdown(MARKET_CARD_TEMPLATE.format_map({
+            'gradient': 'linear-gradient(135deg, #f093fb 0%, #f5576c 100%)',
+            'title': 'BANK NIFTY',
+            'value': f"₹{banknifty_quote['last']:,.2f}" if banknifty_quote else "Awaiting API Connection..."
+        }), unsafe_allow_html=True)
+    
+    market_status = market_status_future.result()
+    st.caption(f"🟢 Market Status: {market_status['market_state']} | Updated: {market_status['timestamp']}")
 
 # Main content
 if st.session_state.data_loaded:
     df = st.session_state.options_df
     spot_price = st.session_state.spot_price
     
-    df_filtered = filter_strikes(df, spot_price, strike_range)
+    df_filtered = _cached_filter(df, spot_price, strike_range)
+    if df_filtered.empty:
+        st.warning(f"⚠️ No strikes within ±{strike_range}% of spot ₹{spot_price:,.2f}. Widen the strike range.")
+        st.stop()
     
-    with st.spinner("Calculating GEX..."):
-        gex_df = calculate_gex(df_filtered, spot_price, expiry_date, risk_free_rate)
-        gamma_levels = find_gamma_levels(gex_df, spot_price)
+    gex_df, gamma_levels, gex_sums = _cached_gex(df_filtered, spot_price, expiry_date, risk_free_rate)
+    st.session_state.gex_sums = gex_sums
     
     st.markdown("---")
     st.subheader("📈 Key Metrics")
@@ -149,73 +367,27 @@ if st.session_state.data_loaded:
         st.metric("💹 Net GEX", format_number(gamma_levels['total_gex']), delta=None)
     
     # --- FULLY RESTORED TABS (Including Tab 4) ---
+    # st.tabs runs every tab body on each rerun, so pick the view with a radio
+    # and render only the active one
     st.markdown("---")
-    tab1, tab2, tab3, tab4 = st.tabs([
-        "📊 GEX Profile",
-        "📉 OI Analysis",
-        "📋 Data Table",
-        "ℹ️ Information"
-    ])
-    
-    with tab1:
-        st.subheader("Gamma Exposure Profile")
-        fig_gex = plot_gex_profile(gex_df, spot_price, gamma_levels)
-        st.plotly_chart(fig_gex, use_container_width=True)
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            st.markdown("##### 🎯 Key Levels")
-            st.write(f"**Support Level:** ₹{gamma_levels.get('support', 'N/A'):,}")
-            st.write(f"**Resistance Level:** ₹{gamma_levels.get('resistance', 'N/A'):,}")
-            st.write(f"**ATM Strike:** ₹{get_atm_strike(spot_price):,}")
-        with col2:
-            st.markdown("##### 📊 GEX Summary")
-            st.write(f"**Total Call GEX:** {format_number(gex_df['call_gex'].sum())}")
-            st.write(f"**Total Put GEX:** {format_number(gex_df['put_gex'].sum())}")
-            st.write(f"**Net GEX:** {format_number(gex_df['total_gex'].sum())}")
-        
-        st.markdown("---")
-        st.subheader("Net GEX vs Spot Movement")
-        fig_spot_gex = plot_spot_gex_levels(gex_df, spot_price, gamma_levels, price_range=500)
-        st.plotly_chart(fig_spot_gex, use_container_width=True)
-    
-    with tab2:
-        st.subheader("Open Interest Analysis")
-        fig_oi = plot_oi_analysis(df_filtered, spot_price)
-        st.plotly_chart(fig_oi, use_container_width=True)
-        
-        st.markdown("---")
-        st.subheader("Put-Call Ratio (PCR) Analysis")
-        fig_pcr = plot_pcr_analysis(df_filtered)
-        st.plotly_chart(fig_pcr, use_container_width=True)
-        
-        total_call_oi = df_filtered[df_filtered['type'] == 'CE']['oi'].sum()
-        total_put_oi = df_filtered[df_filtered['type'] == 'PE']['oi'].sum()
-        overall_pcr = total_put_oi / total_call_oi if total_call_oi > 0 else 0
-        
-        col1, col2, col3 = st.columns(3)
-        col1.metric("Total Call OI", f"{total_call_oi:,.0f}")
-        col2.metric("Total Put OI", f"{total_put_oi:,.0f}")
-        col3.metric("Overall PCR", f"{overall_pcr:.2f}")
-    
-    with tab3:
-        st.subheader("GEX Data Table")
-        display_df = gex_df.copy()
-        display_df['call_gex'] = display_df['call_gex'].apply(lambda x: f"{x:,.0f}")
-        display_df['put_gex'] = display_df['put_gex'].apply(lambda x: f"{x:,.0f}")
-        display_df['total_gex'] = display_df['total_gex'].apply(lambda x: f"{x:,.0f}")
-        
-        st.dataframe(display_df, use_container_width=True, height=400)
-        
-        csv = gex_df.to_csv(index=False)
-        st.download_button(
-            label="📥 Download GEX Data (CSV)",
-            data=csv,
-            file_name=f"gex_data_{symbol}_{expiry_date}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-            mime="text/csv"
-        )
+    active_view = st.radio(
+        "View",
+        ["📊 GEX Profile", "📉 OI Analysis", "📋 Data Table", "ℹ️ Information"],
+        horizontal=True,
+        label_visibility="collapsed",
+        key="active_view"
+    )
+    
+    if active_view == "📊 GEX Profile":
+        _render_gex_tab(gex_df, spot_price, gamma_levels, symbol, expiry_date)
+    
+    elif active_view == "📉 OI Analysis":
+        _render_oi_tab(df_filtered, spot_price, symbol, expiry_date)
     
-    with tab4:
+    elif active_view == "📋 Data Table":
+        _render_data_tab(gex_df, symbol, expiry_date)
+    
+    else:
         st.subheader("ℹ️ Understanding GEX")
         st.markdown("""
         **What is Gamma Exposure (GEX)?**
@@ -258,28 +430,6 @@ else:
     """)
     
     st.markdown("---")
-    st.subheader("📈 Current Market Levels")
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.markdown(f"""
-        <div style='background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
-                    padding: 1.5rem; border-radius: 10px; color: white;'>
-            <h4 style='margin: 0; color: white;'>NIFTY 50</h4>
-            <p style='margin: 0; font-size: 0.9em;'>Awaiting API Connection...</p>
-        </div>
-        """, unsafe_allow_html=True)
-        
-    with col2:
-        st.markdown(f"""
-        <div style='background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%); 
-                    padding: 1.5rem; border-radius: 10px; color: white;'>
-            <h4 style='margin: 0; color: white;'>BANK NIFTY</h4>
-            <p style='margin: 0; font-size: 0.9em;'>Awaiting API Connection...</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    market_status = get_market_status()
-    st.caption(f"🟢 Market Status: {market_status['market_state']} | Updated: {market_status['timestamp']}")
+    _render_market_levels()
     st.markdown("---")
     st.info("💡 **Tip**: Click 'Fetch Data' to pull the live options chain and populate the GEX charts!")
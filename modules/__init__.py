@@ -2,48 +2,49 @@
 GEX Analyzer Modules
 """
 
-from .data_fetcher import (
-    fetch_option_chain, 
-    generate_sample_data, 
-    get_live_spot_price,
-    get_index_quote,
-    get_market_status,
-    get_available_expiries  # <--- Moved here
-)
-from .gex_calculator import calculate_gex, calculate_dex, find_gamma_levels
-from .visualizations import (
-    plot_gex_profile, 
-    plot_spot_gex_levels, 
-    plot_oi_analysis,
-    plot_pcr_analysis,
-    create_summary_metrics
-)
-from .utils import (
-    get_next_expiry, 
-    get_atm_strike, 
-    format_number,
-    filter_strikes,
-    calculate_time_to_expiry # <--- Added this as it's used in your calc module
-)
+import importlib
 
-__all__ = [
-    'fetch_option_chain',
-    'generate_sample_data',
-    'get_live_spot_price',
-    'get_index_quote',
-    'get_market_status',
-    'get_available_expiries',
-    'calculate_gex',
-    'calculate_dex',
-    'find_gamma_levels',
-    'plot_gex_profile',
-    'plot_spot_gex_levels',
-    'plot_oi_analysis',
-    'plot_pcr_analysis',
-    'create_summary_metrics',
-    'get_next_expiry',
-    'get_atm_strike',
-    'format_number',
-    'filter_strikes',
-    'calculate_time_to_expiry'
-]
+# Re-exported names and the submodule that defines them. Submodules are only
+# imported on first access, so `from modules.utils import ...` doesn't pull in
+# Plotly/SciPy for screens that never plot or calculate GEX
+_EXPORTS = {
+    'fetch_option_chain': 'data_fetcher',
+    'generate_sample_data': 'data_fetcher',
+    'get_live_spot_price': 'data_fetcher',
+    'get_index_quote': 'data_fetcher',
+    'get_market_status': 'data_fetcher',
+    'get_available_expiries': 'data_fetcher',
+    'get_symbol_info': 'data_fetcher',
+    'calculate_gex': 'gex_calculator',
+    'calculate_dex': 'gex_calculator',
+    'calculate_greeks': 'gex_calculator',
+    'find_gamma_levels': 'gex_calculator',
+    'plot_gex_profile': 'visualizations',
+    'update_gex_profile': 'visualizations',
+    'plot_spot_gex_levels': 'visualizations',
+    'update_spot_gex_levels': 'visualizations',
+    'plot_oi_analysis': 'visualizations',
+    'update_oi_analysis': 'visualizations',
+    'plot_pcr_analysis': 'visualizations',
+    'update_pcr_analysis': 'visualizations',
+    'create_summary_metrics': 'visualizations',
+    'get_next_expiry': 'utils',
+    'get_atm_strike': 'utils',
+    'format_number': 'utils',
+    'format_numbers': 'utils',
+    'filter_strikes': 'utils',
+    'decimate_strikes': 'utils',
+    'calculate_time_to_expiry': 'utils',
+    'is_market_open': 'utils',
+    'dynamic_ttl': 'utils'
+}
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        module = importlib.import_module(f'.{_EXPORTS[name]}', __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = list(_EXPORTS)
@@ -3,22 +3,46 @@ Data fetching module using Bharat-sm-data (Sensibull)
 """
 
 import pandas as pd
+import numpy as np
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import streamlit as st
 
+# Imported with the module so the first fetch doesn't pay for Bharat-sm-data + bs4
+try:
+    from Derivatives import Sensibull, NSE
+except ImportError:  # Bharat-sm-data not installed, get_apis() raises on use
+    Sensibull = NSE = None
+
 @st.cache_resource
 def get_apis():
     """Initialize the Sensibull and NSE API wrappers."""
-    from Derivatives import Sensibull, NSE
+    if Sensibull is None:
+        raise ImportError("Bharat-sm-data is required for live data (pip install Bharat-sm-data)")
     return Sensibull(), NSE()
 
-def fetch_option_chain(symbol, expiry_date_str, is_index=True, look_ups=20):
+def _interleave_sides(sb_df, field, default=0):
+    """One Sensibull CE/PE field pair as a single array, alternating CE, PE per strike"""
+    n = len(sb_df)
+    ce_col, pe_col = f'CE.{field}', f'PE.{field}'
+    ce = sb_df[ce_col].to_numpy() if ce_col in sb_df.columns else np.full(n, default)
+    pe = sb_df[pe_col].to_numpy() if pe_col in sb_df.columns else np.full(n, default)
+    
+    values = np.empty(2 * n, dtype=np.result_type(ce, pe))
+    values[0::2] = ce
+    values[1::2] = pe
+    return values
+
+def fetch_option_chain(symbol, expiry_date_str, is_index=True, look_ups=20, token=None):
     """
     Fetch option chain data and native Greeks using Sensibull
+    
+    Pass the token from get_symbol_info() to skip the token lookup round-trip.
     """
     try:
         sb, nse = get_apis()
-        token = sb.search_token(symbol)
+        if token is None:
+            token = sb.search_token(symbol)
         
         # Fetch wide-format options data with live Greeks
         sb_df, atm = sb.get_options_data_with_greeks(
@@ -30,33 +54,29 @@ def fetch_option_chain(symbol, expiry_date_str, is_index=True, look_ups=20):
         if sb_df is None or sb_df.empty:
             return None, None
             
-        spot_price = sb_df['future_price'].iloc[0] if 'future_price' in sb_df.columns else atm
+        columns = frozenset(sb_df.columns)
+        spot_price = float(sb_df['future_price'].to_numpy()[0]) if 'future_price' in columns else atm
         
-        # Translate wide format to the long format the original modules expect
-        options_data = []
-        for _, row in sb_df.iterrows():
-            strike = row.get('strike', 0)
-            
-            options_data.append({
-                'strike': strike, 'type': 'CE',
-                'oi': row.get('CE.oi', 0), 'iv': row.get('CE.implied_volatility', 0),
-                'ltp': row.get('CE.last_price', 0), 'native_gamma': row.get('CE.greeks_with_iv.gamma', None)
-            })
-            
-            options_data.append({
-                'strike': strike, 'type': 'PE',
-                'oi': row.get('PE.oi', 0), 'iv': row.get('PE.implied_volatility', 0),
-                'ltp': row.get('PE.last_price', 0), 'native_gamma': row.get('PE.greeks_with_iv.gamma', None)
-            })
-            
-        df = pd.DataFrame(options_data)
+        # Translate wide format to the long format the original modules expect,
+        # one CE row then one PE row per strike, straight from the column arrays
+        strikes = sb_df['strike'].to_numpy() if 'strike' in columns else np.zeros(len(sb_df))
+        df = pd.DataFrame({
+            'strike': np.repeat(strikes, 2),
+            # CE/PE as categorical codes, so every downstream type mask compares int8s
+            'type': pd.Categorical.from_codes(np.tile(np.array([0, 1], dtype=np.int8), len(sb_df)), ['CE', 'PE']),
+            'oi': _interleave_sides(sb_df, 'oi'),
+            'iv': _interleave_sides(sb_df, 'implied_volatility'),
+            'ltp': _interleave_sides(sb_df, 'last_price'),
+            'native_gamma': _interleave_sides(sb_df, 'greeks_with_iv.gamma', default=np.nan)
+        })
         return df, spot_price
         
     except Exception as e:
         print(f"Error fetching option chain from Sensibull: {e}")
         return None, None
 
-@st.cache_data(ttl=300)
+# The expiry list changes at most weekly
+@st.cache_data(ttl=86400)
 def get_available_expiries(symbol, is_index=True):
     """Fetch expiries directly from NSE via Bharat-sm-data"""
     try:
@@ -65,6 +85,30 @@ def get_available_expiries(symbol, is_index=True):
     except:
         return []
 
+# Expiries and tokens change at most weekly
+@st.cache_data(ttl=86400)
+def get_symbol_info(symbol, is_index=True):
+    """Fetch the Sensibull token and NSE expiries for a symbol concurrently"""
+    try:
+        sb, nse = get_apis()
+    except:
+        return None, []
+    
+    # Independent round-trips to two hosts, overlap them
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        token_future = executor.submit(sb.search_token, symbol)
+        expiries_future = executor.submit(nse.get_options_expiry, symbol, is_index=is_index)
+    
+    try:
+        token = token_future.result()
+    except:
+        token = None
+    try:
+        expiries = expiries_future.result()
+    except:
+        expiries = []
+    return token, expiries
+
 # --- RESTORED HELPER FUNCTIONS TO PREVENT IMPORT ERRORS ---
 
 def get_live_spot_price(symbol='NIFTY'):
@@ -2,9 +2,21 @@
 GEX (Gamma Exposure) calculation module
 """
 
+import math
+
 import pandas as pd
 import numpy as np
-from scipy.stats import norm
+from scipy.special import erfc
+
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional, fall back to the NumPy kernel
+    njit = None
+    prange = range
+
+# Standard normal constants: 1/sqrt(2*pi) for the pdf, 1/sqrt(2) for the erfc-based cdf
+_INV_SQRT_2PI = 0.3989422804014327
+_INV_SQRT_2 = 0.7071067811865475
 
 
 def calculate_gamma(S, K, T, r, sigma, option_type='call'):
@@ -27,12 +39,271 @@ def calculate_gamma(S, K, T, r, sigma, option_type='call'):
     
     try:
         d1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * np.sqrt(T))
-        gamma = norm.pdf(d1) / (S * sigma * np.sqrt(T))
+        gamma = np.exp(-0.5 * d1 * d1) * _INV_SQRT_2PI / (S * sigma * np.sqrt(T))
         return gamma
     except:
         return 0
 
 
+def _d1_d2(S, K, T, r, sigma):
+    """
+    Shared Black-Scholes terms for the vectorised greeks
+    
+    Args:
+        S (float): Spot price
+        K (np.ndarray): Strike prices
+        T (float): Time to expiry in years
+        r (float): Risk-free rate
+        sigma (np.ndarray): Implied volatilities, broadcastable against K
+            (e.g. stacked call and put rows so log(S/K) is taken once)
+    
+    Returns:
+        tuple: (d1, d2, sqrt_T), with d1/d2 inf or NaN where T or sigma is 0
+    """
+    sqrt_T = np.sqrt(T) if T > 0 else 0.0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sigma_sqrt_T = sigma * sqrt_T
+        d1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T) / sigma_sqrt_T
+    return d1, d1 - sigma_sqrt_T, sqrt_T
+
+
+def _gamma_batch_numpy(S, K, T, r, sigma):
+    """NumPy Black-Scholes gamma over arrays of strikes and volatilities"""
+    gamma = np.zeros(K.shape[0])
+    valid = (K > 0) & (sigma > 0)
+    if T <= 0 or not valid.any():
+        return gamma
+    
+    K, sigma = K[valid], sigma[valid]
+    d1, _, sqrt_T = _d1_d2(S, K, T, r, sigma)
+    gamma[valid] = np.exp(-0.5 * d1 * d1) * _INV_SQRT_2PI / (S * sigma * sqrt_T)
+    return gamma
+
+
+def _gamma_point(S, K, T, sqrt_T, r, sigma):
+    """Scalar Black-Scholes gamma for the compiled loops, 0 where undefined"""
+    if T <= 0 or K <= 0 or sigma <= 0:
+        return 0.0
+    d1 = (math.log(S / K) + (r + 0.5 * sigma * sigma) * T) / (sigma * sqrt_T)
+    return math.exp(-0.5 * d1 * d1) * _INV_SQRT_2PI / (S * sigma * sqrt_T)
+
+
+def _fused_gex_loop(S, K, T, r, call_iv, put_iv, call_oi, put_oi,
+                    call_gamma, put_gamma, call_missing, put_missing):
+    """Single pass over strikes filling missing gammas and writing call/put/total GEX"""
+    n = K.shape[0]
+    call_gex = np.empty(n)
+    put_gex = np.empty(n)
+    total_gex = np.empty(n)
+    
+    sqrt_T = math.sqrt(T) if T > 0 else 0.0
+    gex_scale = 0.01 * S * S
+    for i in prange(n):
+        if call_missing[i]:
+            call_gamma[i] = _gamma_point(S, K[i], T, sqrt_T, r, call_iv[i])
+        if put_missing[i]:
+            put_gamma[i] = _gamma_point(S, K[i], T, sqrt_T, r, put_iv[i])
+        call_gex[i] = -(call_gamma[i] * call_oi[i]) * gex_scale
+        put_gex[i] = (put_gamma[i] * put_oi[i]) * gex_scale
+        total_gex[i] = call_gex[i] + put_gex[i]
+    return call_gex, put_gex, total_gex
+
+
+if njit is not None:
+    # Rebind the scalar helper first so the fused loop compiles against it
+    _gamma_point = njit(fastmath=True, cache=True)(_gamma_point)
+    _fused_gex_kernel = njit(parallel=True, fastmath=True, cache=True)(_fused_gex_loop)
+else:
+    _fused_gex_kernel = None
+
+
+def _fuse_gex(S, K, T, r, call_iv, put_iv, call_oi, put_oi, call_gamma, put_gamma):
+    """
+    Fill missing (NaN) gammas in place and compute call, put and total GEX
+    
+    Args:
+        S (float): Spot price
+        K (np.ndarray): Strike prices
+        T (float): Time to expiry in years
+        r (float): Risk-free rate
+        call_iv, put_iv (np.ndarray): Implied volatilities per strike
+        call_oi, put_oi (np.ndarray): Open interest per strike
+        call_gamma, put_gamma (np.ndarray): Native gammas, NaN where missing
+    
+    Returns:
+        tuple: (call_gex, put_gex, total_gex) arrays
+    """
+    call_missing = np.isnan(call_gamma)
+    put_missing = np.isnan(put_gamma)
+    
+    if _fused_gex_kernel is not None:
+        return _fused_gex_kernel(float(S), K, float(T), float(r), call_iv, put_iv, call_oi, put_oi,
+                                 call_gamma, put_gamma, call_missing, put_missing)
+    
+    call_gamma[call_missing] = _gamma_batch_numpy(S, K[call_missing], T, r, call_iv[call_missing])
+    put_gamma[put_missing] = _gamma_batch_numpy(S, K[put_missing], T, r, put_iv[put_missing])
+    
+    gex_scale = 0.01 * S * S
+    call_gex = -(call_gamma * call_oi) * gex_scale
+    put_gex = (put_gamma * put_oi) * gex_scale
+    return call_gex, put_gex, call_gex + put_gex
+
+
+def _aggregate_by_strike(df):
+    """
+    Collapse long-format options data to one row per strike
+    
+    Args:
+        df (pd.DataFrame): Options data with strike, type, oi, iv and
+            optionally native_gamma columns
+    
+    Returns:
+        pd.DataFrame: Indexed by sorted strike, with call/put OI, IV (as a
+            fraction, 0.15 where missing) and native gamma (NaN where it
+            must be calculated, 0 where that side has no quotes)
+    """
+    # One groupby with named aggregations, unstacked once into CE/PE columns
+    grouped = df.groupby(['strike', 'type'], observed=True)
+    table = grouped.agg(oi=('oi', 'sum'), iv=('iv', 'mean'))
+    
+    # --- SENSIBULL NATIVE GREEKS INTEGRATION ---
+    # First quote's native gamma per strike and side, NaN marks strikes to calculate
+    if 'native_gamma' in df.columns:
+        table['native_gamma'] = grouped['native_gamma'].first(skipna=False)
+    else:
+        table['native_gamma'] = np.nan
+    # ---------------------------------------------
+    
+    # Nothing to unstack, so hand back the same columns with no strikes
+    if table.empty:
+        oi_dtype = table['oi'].dtype
+        return pd.DataFrame({
+            'call_oi': pd.Series(dtype=oi_dtype),
+            'put_oi': pd.Series(dtype=oi_dtype),
+            'call_iv': pd.Series(dtype=np.float64),
+            'put_iv': pd.Series(dtype=np.float64),
+            'call_native_gamma': pd.Series(dtype=np.float64),
+            'put_native_gamma': pd.Series(dtype=np.float64)
+        }, index=pd.Index([], dtype=df['strike'].dtype, name='strike'))
+    
+    wide = table.unstack('type')
+    strikes = wide.index
+    
+    # A side with no quotes at a strike has 0 OI and falls back to 0.15 IV
+    oi = wide['oi'].reindex(columns=['CE', 'PE'])
+    unquoted = oi.isna().to_numpy()
+    oi = oi.fillna(0).astype(table['oi'].dtype)
+    iv = wide['iv'].reindex(columns=['CE', 'PE']).to_numpy(dtype=np.float64)
+    iv = np.where(iv > 0, iv / 100, 0.15)
+    
+    # No option listed on that side means zero GEX, so give it gamma 0 up front
+    # rather than NaN, which would send it through Black-Scholes
+    native = wide['native_gamma'].reindex(columns=['CE', 'PE']).to_numpy(dtype=np.float64, copy=True)
+    native[unquoted] = 0.0
+    
+    return pd.DataFrame({
+        'call_oi': oi['CE'],
+        'put_oi': oi['PE'],
+        'call_iv': iv[:, 0],
+        'put_iv': iv[:, 1],
+        'call_native_gamma': native[:, 0],
+        'put_native_gamma': native[:, 1]
+    }, index=strikes)
+
+
+def _oi_values(oi):
+    """Per-strike OI as int32 when every value fits, else in its summed dtype"""
+    values = oi.to_numpy()
+    limits = np.iinfo(np.int32)
+    if values.dtype.kind in 'iu' and (values.size == 0 or (values.min() >= limits.min and values.max() <= limits.max)):
+        return values.astype(np.int32)
+    return values
+
+
+def _gex_columns(by_strike, spot_price, T, risk_free_rate):
+    """Gamma and GEX columns for aggregated strikes"""
+    K = by_strike.index.to_numpy(dtype=np.float64)
+    call_oi = by_strike['call_oi'].to_numpy(dtype=np.float64)
+    put_oi = by_strike['put_oi'].to_numpy(dtype=np.float64)
+    
+    # Keep Sensibull's native gamma where present, Black-Scholes for the rest,
+    # GEX = Gamma * OI * Spot^2 * 0.01 in the same pass over strikes
+    # Calls are negative GEX (dealers are short), Puts are positive GEX (dealers are long)
+    call_gamma = by_strike['call_native_gamma'].to_numpy(dtype=np.float64, copy=True)
+    put_gamma = by_strike['put_native_gamma'].to_numpy(dtype=np.float64, copy=True)
+    call_gex, put_gex, total_gex = _fuse_gex(
+        spot_price, K, T, risk_free_rate,
+        by_strike['call_iv'].to_numpy(dtype=np.float64), by_strike['put_iv'].to_numpy(dtype=np.float64),
+        call_oi, put_oi, call_gamma, put_gamma
+    )
+    
+    # Per-strike greeks and OI are display-only, so they're stored compactly; the GEX
+    # columns stay float64 because the gamma flip and totals are running sums over them
+    return {
+        'call_gamma': call_gamma.astype(np.float32),
+        'put_gamma': put_gamma.astype(np.float32),
+        'call_gex': call_gex,
+        'put_gex': put_gex,
+        'total_gex': total_gex,
+        'net_gex': total_gex
+    }
+
+
+def _dex_columns(by_strike, spot_price, T, risk_free_rate):
+    """Delta and DEX columns for aggregated strikes"""
+    K = by_strike.index.to_numpy(dtype=np.float64)
+    call_oi = by_strike['call_oi'].to_numpy(dtype=np.float64)
+    put_oi = by_strike['put_oi'].to_numpy(dtype=np.float64)
+    call_iv = by_strike['call_iv'].to_numpy()
+    put_iv = by_strike['put_iv'].to_numpy()
+    
+    # Calculate delta, intrinsic 0/1 where Black-Scholes is undefined
+    d1, _, _ = _d1_d2(spot_price, K, T, risk_free_rate, np.vstack([call_iv, put_iv]))
+    d1_call, d1_put = d1
+    
+    call_delta = np.where((T > 0) & (call_iv > 0), 0.5 * erfc(-d1_call * _INV_SQRT_2), np.where(spot_price > K, 1.0, 0.0))
+    put_delta = np.where((T > 0) & (put_iv > 0), -0.5 * erfc(d1_put * _INV_SQRT_2), np.where(spot_price < K, -1.0, 0.0))
+    
+    # DEX = Delta * OI * Spot * multiplier
+    call_dex = -call_delta * call_oi * spot_price
+    put_dex = -put_delta * put_oi * spot_price
+    
+    return {
+        'call_delta': call_delta.astype(np.float32),
+        'put_delta': put_delta.astype(np.float32),
+        'call_dex': call_dex,
+        'put_dex': put_dex,
+        'total_dex': call_dex + put_dex
+    }
+
+
+def calculate_greeks(df, spot_price, expiry_date_str, risk_free_rate=0.07):
+    """
+    Calculate GEX and DEX for each strike from a single aggregation pass
+    
+    Args:
+        df (pd.DataFrame): Options data
+        spot_price (float): Current spot price
+        expiry_date_str (str): Expiry date
+        risk_free_rate (float): Risk-free rate
+    
+    Returns:
+        pd.DataFrame: Strike, OI, gamma/GEX and delta/DEX columns
+    """
+    from modules.utils import calculate_time_to_expiry
+    
+    T = calculate_time_to_expiry(expiry_date_str)
+    by_strike = _aggregate_by_strike(df)
+    
+    return pd.DataFrame({
+        'strike': by_strike.index.to_numpy(),
+        'call_oi': _oi_values(by_strike['call_oi']),
+        'put_oi': _oi_values(by_strike['put_oi']),
+        **_gex_columns(by_strike, spot_price, T, risk_free_rate),
+        **_dex_columns(by_strike, spot_price, T, risk_free_rate)
+    })
+
+
 def calculate_gex(df, spot_price, expiry_date_str, risk_free_rate=0.07):
     """
     Calculate Gamma Exposure (GEX) for each strike
@@ -49,57 +320,14 @@ def calculate_gex(df, spot_price, expiry_date_str, risk_free_rate=0.07):
     from modules.utils import calculate_time_to_expiry
     
     T = calculate_time_to_expiry(expiry_date_str)
+    by_strike = _aggregate_by_strike(df)
     
-    gex_data = []
-    
-    # Group by strike
-    for strike in df['strike'].unique():
-        strike_data = df[df['strike'] == strike]
-        
-        call_data = strike_data[strike_data['type'] == 'CE']
-        put_data = strike_data[strike_data['type'] == 'PE']
-        
-        call_oi = call_data['oi'].sum() if not call_data.empty else 0
-        put_oi = put_data['oi'].sum() if not put_data.empty else 0
-        
-        call_iv = call_data['iv'].mean() / 100 if not call_data.empty and call_data['iv'].mean() > 0 else 0.15
-        put_iv = put_data['iv'].mean() / 100 if not put_data.empty and put_data['iv'].mean() > 0 else 0.15
-        
-        # --- SENSIBULL NATIVE GREEKS INTEGRATION ---
-        # Check if we have Sensibull's native gamma for CALLS, otherwise calculate it
-        if 'native_gamma' in call_data.columns and not call_data.empty and pd.notna(call_data['native_gamma'].iloc[0]):
-            call_gamma = call_data['native_gamma'].iloc[0]
-        else:
-            call_gamma = calculate_gamma(spot_price, strike, T, risk_free_rate, call_iv, 'call')
-            
-        # Check if we have Sensibull's native gamma for PUTS, otherwise calculate it
-        if 'native_gamma' in put_data.columns and not put_data.empty and pd.notna(put_data['native_gamma'].iloc[0]):
-            put_gamma = put_data['native_gamma'].iloc[0]
-        else:
-            put_gamma = calculate_gamma(spot_price, strike, T, risk_free_rate, put_iv, 'put')
-        # ---------------------------------------------
-        
-        # GEX = Gamma * OI * Spot^2 * 0.01
-        # Calls are negative GEX (dealers are short), Puts are positive GEX (dealers are long)
-        call_gex = -call_gamma * call_oi * spot_price * spot_price * 0.01
-        put_gex = put_gamma * put_oi * spot_price * spot_price * 0.01
-        
-        total_gex = call_gex + put_gex
-        
-        gex_data.append({
-            'strike': strike,
-            'call_oi': call_oi,
-            'put_oi': put_oi,
-            'call_gamma': call_gamma,
-            'put_gamma': put_gamma,
-            'call_gex': call_gex,
-            'put_gex': put_gex,
-            'total_gex': total_gex,
-            'net_gex': total_gex
-        })
-    
-    gex_df = pd.DataFrame(gex_data)
-    gex_df = gex_df.sort_values('strike')
+    gex_df = pd.DataFrame({
+        'strike': by_strike.index.to_numpy(),
+        'call_oi': _oi_values(by_strike['call_oi']),
+        'put_oi': _oi_values(by_strike['put_oi']),
+        **_gex_columns(by_strike, spot_price, T, risk_free_rate)
+    })
     
     return gex_df
 
@@ -120,51 +348,12 @@ def calculate_dex(df, spot_price, expiry_date_str, risk_free_rate=0.07):
     from modules.utils import calculate_time_to_expiry
     
     T = calculate_time_to_expiry(expiry_date_str)
+    by_strike = _aggregate_by_strike(df)
     
-    dex_data = []
-    
-    for strike in df['strike'].unique():
-        strike_data = df[df['strike'] == strike]
-        
-        call_data = strike_data[strike_data['type'] == 'CE']
-        put_data = strike_data[strike_data['type'] == 'PE']
-        
-        call_oi = call_data['oi'].sum() if not call_data.empty else 0
-        put_oi = put_data['oi'].sum() if not put_data.empty else 0
-        
-        call_iv = call_data['iv'].mean() / 100 if not call_data.empty and call_data['iv'].mean() > 0 else 0.15
-        put_iv = put_data['iv'].mean() / 100 if not put_data.empty and put_data['iv'].mean() > 0 else 0.15
-        
-        # Calculate delta
-        if T > 0 and call_iv > 0:
-            d1_call = (np.log(spot_price / strike) + (risk_free_rate + 0.5 * call_iv ** 2) * T) / (call_iv * np.sqrt(T))
-            call_delta = norm.cdf(d1_call)
-        else:
-            call_delta = 1 if spot_price > strike else 0
-        
-        if T > 0 and put_iv > 0:
-            d1_put = (np.log(spot_price / strike) + (risk_free_rate + 0.5 * put_iv ** 2) * T) / (put_iv * np.sqrt(T))
-            put_delta = -norm.cdf(-d1_put)
-        else:
-            put_delta = -1 if spot_price < strike else 0
-        
-        # DEX = Delta * OI * Spot * multiplier
-        call_dex = -call_delta * call_oi * spot_price
-        put_dex = -put_delta * put_oi * spot_price
-        
-        total_dex = call_dex + put_dex
-        
-        dex_data.append({
-            'strike': strike,
-            'call_delta': call_delta,
-            'put_delta': put_delta,
-            'call_dex': call_dex,
-            'put_dex': put_dex,
-            'total_dex': total_dex
-        })
-    
-    dex_df = pd.DataFrame(dex_data)
-    dex_df = dex_df.sort_values('strike')
+    dex_df = pd.DataFrame({
+        'strike': by_strike.index.to_numpy(),
+        **_dex_columns(by_strike, spot_price, T, risk_free_rate)
+    })
     
     return dex_df
 
@@ -180,26 +369,27 @@ def find_gamma_levels(gex_df, spot_price):
     Returns:
         dict: Key gamma levels
     """
-    # Find zero gamma (gamma flip point)
-    gex_df['cumulative_gex'] = gex_df['total_gex'].cumsum()
+    strikes = gex_df['strike'].to_numpy()
+    total_gex = gex_df['total_gex'].to_numpy()
     
-    # Find where cumulative GEX crosses zero
-    zero_cross = gex_df[gex_df['cumulative_gex'].abs() == gex_df['cumulative_gex'].abs().min()]
-    gamma_flip = zero_cross['strike'].values[0] if not zero_cross.empty else spot_price
-    
-    # Find max positive GEX (support)
-    max_positive = gex_df[gex_df['total_gex'] == gex_df['total_gex'].max()]
-    support_level = max_positive['strike'].values[0] if not max_positive.empty else None
+    # Find zero gamma (gamma flip point)
+    cumulative_gex = np.cumsum(total_gex)
+    gex_df['cumulative_gex'] = cumulative_gex
     
-    # Find max negative GEX (resistance)
-    max_negative = gex_df[gex_df['total_gex'] == gex_df['total_gex'].min()]
-    resistance_level = max_negative['strike'].values[0] if not max_negative.empty else None
+    if strikes.size:
+        # Find where cumulative GEX is closest to zero
+        gamma_flip = strikes[np.abs(cumulative_gex).argmin()]
+        # Find max positive GEX (support) and max negative GEX (resistance)
+        support_level = strikes[total_gex.argmax()]
+        resistance_level = strikes[total_gex.argmin()]
+    else:
+        gamma_flip, support_level, resistance_level = spot_price, None, None
     
     return {
         'gamma_flip': gamma_flip,
         'support': support_level,
         'resistance': resistance_level,
-        'total_gex': gex_df['total_gex'].sum(),
-        'net_gex_above_spot': gex_df[gex_df['strike'] > spot_price]['total_gex'].sum(),
-        'net_gex_below_spot': gex_df[gex_df['strike'] <= spot_price]['total_gex'].sum()
+        'total_gex': total_gex.sum(),
+        'net_gex_above_spot': total_gex[strikes > spot_price].sum(),
+        'net_gex_below_spot': total_gex[strikes <= spot_price].sum()
     }
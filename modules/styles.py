@@ -0,0 +1,44 @@
+"""
+Static page styles for GEX Analyzer
+"""
+
+# Imported once per process, so reruns reuse the same string
+CUSTOM_CSS = """
+<style>
+.main-header {
+    font-size: 2.5rem;
+    font-weight: bold;
+    color: #1f77b4;
+    text-align: center;
+    margin-bottom: 1rem;
+}
+.metric-card {
+    background-color: #f0f2f6;
+    padding: 1rem;
+    border-radius: 0.5rem;
+    margin: 0.5rem 0;
+}
+.live-indicator {
+    display: inline-block;
+    width: 10px;
+    height: 10px;
+    background-color: #22c55e;
+    border-radius: 50%;
+    margin-right: 5px;
+    animation: pulse 2s infinite;
+}
+@keyframes pulse {
+    0%, 100% { opacity: 1; }
+    50% { opacity: 0.5; }
+}
+</style>
+"""
+
+# Welcome-screen index card, filled with str.format_map
+MARKET_CARD_TEMPLATE = """
+<div style='background: {gradient};
+            padding: 1.5rem; border-radius: 10px; color: white;'>
+    <h4 style='margin: 0; color: white;'>{title}</h4>
+    <p style='margin: 0; font-size: 0.9em;'>{value}</p>
+</div>
+"""
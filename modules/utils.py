@@ -3,9 +3,20 @@ Utility functions for GEX Analyzer
 """
 
 import pandas as pd
-from datetime import datetime, timedelta
+import numpy as np
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
 import calendar
 
+# NSE trades Mon-Fri 09:15-15:30 India Standard Time
+IST = timezone(timedelta(hours=5, minutes=30))
+
+
+def _last_thursday(year, month):
+    """Date of the last Thursday in a month"""
+    last_day = max(week[calendar.THURSDAY] for week in calendar.monthcalendar(year, month))
+    return date(year, month, last_day)
+
 
 def get_next_expiry(expiry_type='weekly'):
     """
@@ -26,40 +37,32 @@ def get_next_expiry(expiry_type='weekly'):
             days_ahead += 7
         expiry = today + timedelta(days=days_ahead)
     else:
-        # Last Thursday of current month
-        last_day = calendar.monthrange(today.year, today.month)[1]
-        last_date = datetime(today.year, today.month, last_day)
-        
-        # Find last Thursday
-        offset = (last_date.weekday() - 3) % 7
-        expiry = last_date - timedelta(days=offset)
-        
-        # If we've passed it, get next month's
-        if expiry < today:
-            if today.month == 12:
-                next_month = datetime(today.year + 1, 1, 1)
-            else:
-                next_month = datetime(today.year, today.month + 1, 1)
-            
-            last_day = calendar.monthrange(next_month.year, next_month.month)[1]
-            last_date = datetime(next_month.year, next_month.month, last_day)
-            offset = (last_date.weekday() - 3) % 7
-            expiry = last_date - timedelta(days=offset)
+        # Last Thursday of current month, next month's from expiry day onwards
+        year, month = today.year, today.month
+        expiry = _last_thursday(year, month)
+        if expiry <= today.date():
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+            expiry = _last_thursday(year, month)
     
     return expiry.strftime('%d-%b-%Y').upper()
 
 
-def get_atm_strike(spot_price, strike_interval=50):
+def get_atm_strike(spot_price, strike_interval=50, strikes=None):
     """
     Get the At-The-Money strike price
     
     Args:
         spot_price (float): Current spot price
         strike_interval (int): Strike price interval
+        strikes (array-like, optional): Listed strikes; when given, the
+            nearest listed strike is returned instead of rounding
     
     Returns:
         int: ATM strike price
     """
+    if strikes is not None and len(strikes):
+        strikes = np.asarray(strikes)
+        return strikes[np.abs(strikes - spot_price).argmin()]
     return round(spot_price / strike_interval) * strike_interval
 
 
@@ -81,6 +84,36 @@ def format_number(num):
         return f"₹{num:,.0f}"
 
 
+def format_numbers(values):
+    """
+    Format an array of large numbers for display, as format_number does
+    
+    Args:
+        values (array-like): Numbers to format
+    
+    Returns:
+        np.ndarray: Formatted strings (object dtype), same shape as values
+    """
+    values = np.asarray(values, dtype=np.float64)
+    magnitude = np.abs(values)
+    crore = magnitude >= 10000000
+    lakh = (magnitude >= 100000) & ~crore
+    rest = ~(crore | lakh)
+    
+    # Scale each magnitude band in one array op, only the string formatting is per value
+    out = np.empty(values.shape, dtype=object)
+    out[crore] = [f"₹{v:.2f}Cr" for v in values[crore] / 10000000]
+    out[lakh] = [f"₹{v:.2f}L" for v in values[lakh] / 100000]
+    out[rest] = [f"₹{v:,.0f}" for v in values[rest]]
+    return out
+
+
+@lru_cache(maxsize=256)
+def _parse_expiry(expiry_date_str):
+    """Parse a DD-MMM-YYYY expiry once, strptime's month-name lookup is slow"""
+    return datetime.strptime(expiry_date_str, '%d-%b-%Y')
+
+
 def calculate_time_to_expiry(expiry_date_str):
     """
     Calculate time to expiry in years
@@ -92,7 +125,7 @@ def calculate_time_to_expiry(expiry_date_str):
         float: Time to expiry in years
     """
     try:
-        expiry_date = datetime.strptime(expiry_date_str, '%d-%b-%Y')
+        expiry_date = _parse_expiry(expiry_date_str)
         today = datetime.now()
         days_to_expiry = (expiry_date - today).days
         return max(days_to_expiry / 365.0, 0.0027)  # Minimum 1 day
@@ -100,6 +133,38 @@ def calculate_time_to_expiry(expiry_date_str):
         return 0.0027  # Default to 1 day
 
 
+def is_market_open(now=None):
+    """
+    Check whether the NSE F&O session is open
+    
+    Args:
+        now (datetime, optional): Time to check, defaults to the current time
+    
+    Returns:
+        bool: True on weekdays between 09:15 and 15:30 IST
+    """
+    now = (now or datetime.now(IST)).astimezone(IST)
+    if now.weekday() >= 5:
+        return False
+    minutes = now.hour * 60 + now.minute
+    return 9 * 60 + 15 <= minutes <= 15 * 60 + 30
+
+
+def dynamic_ttl(now=None, live_ttl=5, closed_ttl=3600):
+    """
+    Cache lifetime for option chain snapshots, matched to how often they change
+    
+    Args:
+        now (datetime, optional): Time to check, defaults to the current time
+        live_ttl (int): Seconds to cache while the market is open
+        closed_ttl (int): Seconds to cache off-hours, when OI doesn't move
+    
+    Returns:
+        int: TTL in seconds
+    """
+    return live_ttl if is_market_open(now) else closed_ttl
+
+
 def filter_strikes(df, spot_price, range_pct=10):
     """
     Filter strikes within a percentage range of spot price
@@ -115,9 +180,51 @@ def filter_strikes(df, spot_price, range_pct=10):
     lower_bound = spot_price * (1 - range_pct/100)
     upper_bound = spot_price * (1 + range_pct/100)
     
+    # Option chains sorted by strike can be sliced by binary search instead of masked
+    if df['strike'].is_monotonic_increasing:
+        strikes = df['strike'].to_numpy()
+        start = np.searchsorted(strikes, lower_bound, side='left')
+        end = np.searchsorted(strikes, upper_bound, side='right')
+        return df.iloc[start:end]
+    
     return df[(df['strike'] >= lower_bound) & (df['strike'] <= upper_bound)]
 
 
+def decimate_strikes(df, max_strikes=200, key='total_gex'):
+    """
+    Keep only the strikes that dominate a chart when there are too many to plot
+    
+    Args:
+        df (pd.DataFrame): Data with a 'strike' column (one or more rows per strike)
+        max_strikes (int): Maximum number of strikes to keep
+        key (str): Column whose absolute per-strike total ranks the strikes
+    
+    Returns:
+        pd.DataFrame: df unchanged if it has at most max_strikes strikes,
+            otherwise only the rows of the top strikes, in the original order
+    """
+    if df['strike'].nunique() <= max_strikes:
+        return df
+    
+    weight = df[key].abs().groupby(df['strike']).sum()
+    keep = weight.nlargest(max_strikes).index
+    return df[df['strike'].isin(keep)]
+
+
+@lru_cache(maxsize=8)
+def _expiries_for(date_ordinal):
+    """Next 12 weekly expiries from the given day, computed once per calendar day"""
+    today = date.fromordinal(date_ordinal)
+    
+    # First Thursday strictly after today, then every 7 days (Thursday is 3)
+    days_ahead = (3 - today.weekday() - 1) % 7 + 1
+    first = np.datetime64(today, 'D') + np.timedelta64(days_ahead, 'D')
+    expiries = first + np.arange(12) * np.timedelta64(7, 'D')
+    expiries = pd.DatetimeIndex(expiries).strftime('%d-%b-%Y').str.upper()
+    
+    return tuple(expiries)
+
+
 def get_available_expiries():
     """
     Get list of available expiry dates (next 3 months)
@@ -125,17 +232,4 @@ def get_available_expiries():
     Returns:
         list: List of expiry dates
     """
-    expiries = []
-    today = datetime.now()
-    
-    # Get next 12 weekly expiries
-    current = today
-    for _ in range(12):
-        days_ahead = 3 - current.weekday()
-        if days_ahead <= 0:
-            days_ahead += 7
-        expiry = current + timedelta(days=days_ahead)
-        expiries.append(expiry.strftime('%d-%b-%Y').upper())
-        current = expiry + timedelta(days=1)
-    
-    return expiries
+    return list(_expiries_for(datetime.now().toordinal()))
@@ -3,43 +3,31 @@ Visualization module for GEX analysis
 """
 
 import plotly.graph_objects as go
+import plotly.io as pio
 import plotly.express as px
 from plotly.subplots import make_subplots
 import pandas as pd
+import numpy as np
+import streamlit as st
 
+# Resolve the chart template once at import instead of in every update_layout
+pio.templates.default = 'plotly_white'
 
-def plot_gex_profile(gex_df, spot_price, gamma_levels):
-    """
-    Plot GEX profile with call and put GEX
-    
-    Args:
-        gex_df (pd.DataFrame): GEX data
-        spot_price (float): Current spot price
-        gamma_levels (dict): Key gamma levels
-    
-    Returns:
-        plotly.graph_objects.Figure: GEX profile chart
-    """
-    fig = go.Figure()
-    
-    # Add Call GEX (negative)
-    fig.add_trace(go.Bar(
-        x=gex_df['strike'],
-        y=gex_df['call_gex'],
-        name='Call GEX',
-        marker_color='rgba(239, 68, 68, 0.7)',
-        hovertemplate='Strike: %{x}<br>Call GEX: %{y:,.0f}<extra></extra>'
-    ))
-    
-    # Add Put GEX (positive)
-    fig.add_trace(go.Bar(
-        x=gex_df['strike'],
-        y=gex_df['put_gex'],
-        name='Put GEX',
-        marker_color='rgba(34, 197, 94, 0.7)',
-        hovertemplate='Strike: %{x}<br>Put GEX: %{y:,.0f}<extra></extra>'
-    ))
-    
+# Layout shared by every chart, copied into each new figure. Traces are passed
+# as plain dict specs so each one is validated once, when the figure is built,
+# rather than once in its go.Bar/go.Scatter constructor and again on copy
+_BASE_LAYOUT = go.Layout(hovermode='x unified', height=400)
+_PROFILE_LAYOUT = go.Layout(hovermode='x unified', height=500)
+
+
+def _hover_amounts(values):
+    """Pre-formatted hover labels, so plotly.js substitutes strings instead of formatting numbers"""
+    # Format from the float64 values, float32 bar heights would misprint the digits
+    return [f"{v:,.0f}" for v in values.tolist()]
+
+
+def _add_gex_profile_lines(fig, spot_price, gamma_levels):
+    """Draw the spot, gamma flip and zero reference lines on a GEX profile"""
     # Add spot price line
     fig.add_vline(
         x=spot_price,
@@ -61,15 +49,55 @@ def plot_gex_profile(gex_df, spot_price, gamma_levels):
     
     # Add zero line
     fig.add_hline(y=0, line_dash="solid", line_color="gray", line_width=1)
+
+
+def plot_gex_profile(gex_df, spot_price, gamma_levels):
+    """
+    Plot GEX profile with call and put GEX
+    
+    Args:
+        gex_df (pd.DataFrame): GEX data
+        spot_price (float): Current spot price
+        gamma_levels (dict): Key gamma levels
+    
+    Returns:
+        plotly.graph_objects.Figure: GEX profile chart
+    """
+    strikes = gex_df['strike'].to_numpy()
+    call_gex = gex_df['call_gex'].to_numpy()
+    put_gex = gex_df['put_gex'].to_numpy()
+    
+    # float32 bar heights halve the Plotly payload, far more precision than a bar chart needs
+    fig = go.Figure(data=[
+        # Add Call GEX (negative)
+        dict(
+            type='bar',
+            x=strikes,
+            y=call_gex.astype(np.float32),
+            customdata=_hover_amounts(call_gex),
+            name='Call GEX',
+            marker=dict(color='rgba(239, 68, 68, 0.7)'),
+            hovertemplate='Strike: %{x}<br>Call GEX: %{customdata}<extra></extra>'
+        ),
+        # Add Put GEX (positive)
+        dict(
+            type='bar',
+            x=strikes,
+            y=put_gex.astype(np.float32),
+            customdata=_hover_amounts(put_gex),
+            name='Put GEX',
+            marker=dict(color='rgba(34, 197, 94, 0.7)'),
+            hovertemplate='Strike: %{x}<br>Put GEX: %{customdata}<extra></extra>'
+        )
+    ], layout=_PROFILE_LAYOUT)
+    
+    _add_gex_profile_lines(fig, spot_price, gamma_levels)
     
     fig.update_layout(
         title="Gamma Exposure (GEX) Profile",
         xaxis_title="Strike Price",
         yaxis_title="GEX",
         barmode='relative',
-        hovermode='x unified',
-        template='plotly_white',
-        height=500,
         showlegend=True,
         legend=dict(
             yanchor="top",
@@ -82,42 +110,54 @@ def plot_gex_profile(gex_df, spot_price, gamma_levels):
     return fig
 
 
-def plot_spot_gex_levels(gex_df, spot_price, gamma_levels, price_range=500):
+def update_gex_profile(fig, gex_df, spot_price, gamma_levels):
     """
-    Plot how GEX changes as spot moves
+    Refresh a figure built by plot_gex_profile with new data, in place
+    
+    Only the bar data and reference lines change, so the traces, layout
+    and template already on the figure are reused.
     
     Args:
+        fig (plotly.graph_objects.Figure): Figure from plot_gex_profile
         gex_df (pd.DataFrame): GEX data
         spot_price (float): Current spot price
         gamma_levels (dict): Key gamma levels
-        price_range (int): Range around spot to simulate
     
     Returns:
-        plotly.graph_objects.Figure: Spot vs GEX chart
+        plotly.graph_objects.Figure: The updated figure
     """
-    import numpy as np
+    strikes = gex_df['strike'].to_numpy()
+    call_gex = gex_df['call_gex'].to_numpy()
+    put_gex = gex_df['put_gex'].to_numpy()
+    
+    with fig.batch_update():
+        fig.data[0].x = strikes
+        fig.data[0].y = call_gex.astype(np.float32)
+        fig.data[0].customdata = _hover_amounts(call_gex)
+        fig.data[1].x = strikes
+        fig.data[1].y = put_gex.astype(np.float32)
+        fig.data[1].customdata = _hover_amounts(put_gex)
+    
+    # add_vline/add_hline can't run inside batch_update, redraw them after
+    fig.layout.shapes = ()
+    fig.layout.annotations = ()
+    _add_gex_profile_lines(fig, spot_price, gamma_levels)
     
+    return fig
+
+
+def _spot_gex_curve(gex_df, spot_price, price_range):
+    """Simulated spot levels and the net GEX at each"""
     # Simulate spot prices
     spot_range = np.arange(spot_price - price_range, spot_price + price_range, 10)
-    gex_at_spot = []
-    
-    for sim_spot in spot_range:
-        # Calculate net GEX at this spot level
-        net_gex = gex_df['total_gex'].sum()
-        gex_at_spot.append(net_gex)
-    
-    fig = go.Figure()
-    
-    fig.add_trace(go.Scatter(
-        x=spot_range,
-        y=gex_at_spot,
-        mode='lines',
-        name='Net GEX',
-        line=dict(color='blue', width=2),
-        fill='tozeroy',
-        fillcolor='rgba(59, 130, 246, 0.2)'
-    ))
     
+    # Net GEX from the current chain, held flat across the simulated range
+    net_gex = float(gex_df['total_gex'].sum())
+    return spot_range, np.full(spot_range.shape, net_gex, dtype=np.float32)
+
+
+def _add_spot_gex_lines(fig, spot_price):
+    """Draw the current spot and zero reference lines on a spot vs GEX chart"""
     # Add current spot
     fig.add_vline(
         x=spot_price,
@@ -129,54 +169,91 @@ def plot_spot_gex_levels(gex_df, spot_price, gamma_levels, price_range=500):
     
     # Add zero line
     fig.add_hline(y=0, line_dash="solid", line_color="gray")
+
+
+def plot_spot_gex_levels(gex_df, spot_price, gamma_levels, price_range=500):
+    """
+    Plot how GEX changes as spot moves
+    
+    Args:
+        gex_df (pd.DataFrame): GEX data
+        spot_price (float): Current spot price
+        gamma_levels (dict): Key gamma levels
+        price_range (int): Range around spot to simulate
+    
+    Returns:
+        plotly.graph_objects.Figure: Spot vs GEX chart
+    """
+    spot_range, gex_at_spot = _spot_gex_curve(gex_df, spot_price, price_range)
+    
+    fig = go.Figure(data=[
+        dict(
+            type='scatter',
+            x=spot_range,
+            y=gex_at_spot,
+            mode='lines',
+            name='Net GEX',
+            line=dict(color='blue', width=2),
+            fill='tozeroy',
+            fillcolor='rgba(59, 130, 246, 0.2)'
+        )
+    ], layout=_BASE_LAYOUT)
+    
+    _add_spot_gex_lines(fig, spot_price)
     
     fig.update_layout(
         title="Net GEX vs Spot Price",
         xaxis_title="Spot Price",
-        yaxis_title="Net GEX",
-        template='plotly_white',
-        height=400,
-        hovermode='x unified'
+        yaxis_title="Net GEX"
     )
     
     return fig
 
 
-def plot_oi_analysis(df, spot_price):
+def update_spot_gex_levels(fig, gex_df, spot_price, gamma_levels, price_range=500):
     """
-    Plot Open Interest analysis
+    Refresh a figure built by plot_spot_gex_levels with new data, in place
     
     Args:
-        df (pd.DataFrame): Options data
+        fig (plotly.graph_objects.Figure): Figure from plot_spot_gex_levels
+        gex_df (pd.DataFrame): GEX data
         spot_price (float): Current spot price
+        gamma_levels (dict): Key gamma levels
+        price_range (int): Range around spot to simulate
     
     Returns:
-        plotly.graph_objects.Figure: OI analysis chart
+        plotly.graph_objects.Figure: The updated figure
     """
-    # Aggregate OI by strike
-    oi_data = df.groupby(['strike', 'type'])['oi'].sum().reset_index()
+    spot_range, gex_at_spot = _spot_gex_curve(gex_df, spot_price, price_range)
     
-    call_oi = oi_data[oi_data['type'] == 'CE'].set_index('strike')['oi']
-    put_oi = oi_data[oi_data['type'] == 'PE'].set_index('strike')['oi']
+    with fig.batch_update():
+        fig.data[0].x = spot_range
+        fig.data[0].y = gex_at_spot
     
-    strikes = sorted(df['strike'].unique())
-    
-    fig = go.Figure()
-    
-    fig.add_trace(go.Bar(
-        x=strikes,
-        y=[call_oi.get(s, 0) for s in strikes],
-        name='Call OI',
-        marker_color='rgba(239, 68, 68, 0.6)'
-    ))
-    
-    fig.add_trace(go.Bar(
-        x=strikes,
-        y=[put_oi.get(s, 0) for s in strikes],
-        name='Put OI',
-        marker_color='rgba(34, 197, 94, 0.6)'
-    ))
+    fig.layout.shapes = ()
+    fig.layout.annotations = ()
+    _add_spot_gex_lines(fig, spot_price)
     
+    return fig
+
+
+def _oi_by_strike(df):
+    """Sorted strikes with the call and put OI bar heights for each"""
+    # Aggregate OI by strike, CE/PE side by side and 0 where a side is missing
+    oi_by_strike = (df.groupby(['strike', 'type'], sort=False, observed=True)['oi'].sum()
+                      .unstack('type', fill_value=0)
+                      .reindex(columns=['CE', 'PE'], fill_value=0)
+                      .sort_index())
+    
+    strikes = oi_by_strike.index.to_numpy()
+    call_y = oi_by_strike['CE'].to_numpy()
+    put_y = oi_by_strike['PE'].to_numpy()
+    
+    return strikes, call_y, put_y
+
+
+def _add_oi_lines(fig, spot_price):
+    """Draw the spot line on an OI chart"""
     # Add spot line
     fig.add_vline(
         x=spot_price,
@@ -184,20 +261,96 @@ def plot_oi_analysis(df, spot_price):
         line_color="blue",
         annotation_text=f"Spot: {spot_price}"
     )
+
+
+def plot_oi_analysis(df, spot_price):
+    """
+    Plot Open Interest analysis
+    
+    Args:
+        df (pd.DataFrame): Options data
+        spot_price (float): Current spot price
+    
+    Returns:
+        plotly.graph_objects.Figure: OI analysis chart
+    """
+    strikes, call_y, put_y = _oi_by_strike(df)
+    
+    fig = go.Figure(data=[
+        dict(
+            type='bar',
+            x=strikes,
+            y=call_y,
+            name='Call OI',
+            marker=dict(color='rgba(239, 68, 68, 0.6)')
+        ),
+        dict(
+            type='bar',
+            x=strikes,
+            y=put_y,
+            name='Put OI',
+            marker=dict(color='rgba(34, 197, 94, 0.6)')
+        )
+    ], layout=_BASE_LAYOUT)
+    
+    _add_oi_lines(fig, spot_price)
     
     fig.update_layout(
         title="Open Interest Distribution",
         xaxis_title="Strike Price",
         yaxis_title="Open Interest",
-        barmode='group',
-        template='plotly_white',
-        height=400,
-        hovermode='x unified'
+        barmode='group'
     )
     
     return fig
 
 
+def update_oi_analysis(fig, df, spot_price):
+    """
+    Refresh a figure built by plot_oi_analysis with new data, in place
+    
+    Args:
+        fig (plotly.graph_objects.Figure): Figure from plot_oi_analysis
+        df (pd.DataFrame): Options data
+        spot_price (float): Current spot price
+    
+    Returns:
+        plotly.graph_objects.Figure: The updated figure
+    """
+    strikes, call_y, put_y = _oi_by_strike(df)
+    
+    with fig.batch_update():
+        fig.data[0].x = strikes
+        fig.data[0].y = call_y
+        fig.data[1].x = strikes
+        fig.data[1].y = put_y
+    
+    fig.layout.shapes = ()
+    fig.layout.annotations = ()
+    _add_oi_lines(fig, spot_price)
+    
+    return fig
+
+
+def _pcr_by_strike(df):
+    """Per-strike call OI, put OI and PCR"""
+    # Call/put OI side by side per strike, 0 where a side has no quotes
+    oi_by_strike = (df.groupby(['strike', 'type'], observed=True)['oi'].sum()
+                      .unstack('type', fill_value=0)
+                      .reindex(columns=['CE', 'PE'], fill_value=0))
+    call_oi = oi_by_strike['CE']
+    put_oi = oi_by_strike['PE']
+    pcr = (put_oi / call_oi).where(call_oi > 0, 0)
+    
+    # Plain arrays, so the frame is built in one block without re-aligning on strike
+    return pd.DataFrame({
+        'strike': oi_by_strike.index.to_numpy(),
+        'pcr': pcr.to_numpy(),
+        'call_oi': call_oi.to_numpy(),
+        'put_oi': put_oi.to_numpy()
+    })
+
+
 def plot_pcr_analysis(df):
     """
     Plot Put-Call Ratio analysis
@@ -208,35 +361,20 @@ def plot_pcr_analysis(df):
     Returns:
         plotly.graph_objects.Figure: PCR chart
     """
-    pcr_data = df.groupby(['strike', 'type'])['oi'].sum().reset_index()
-    
-    pcr_by_strike = []
-    
-    for strike in sorted(df['strike'].unique()):
-        call_oi = pcr_data[(pcr_data['strike'] == strike) & (pcr_data['type'] == 'CE')]['oi'].sum()
-        put_oi = pcr_data[(pcr_data['strike'] == strike) & (pcr_data['type'] == 'PE')]['oi'].sum()
-        
-        pcr = put_oi / call_oi if call_oi > 0 else 0
-        
-        pcr_by_strike.append({
-            'strike': strike,
-            'pcr': pcr,
-            'call_oi': call_oi,
-            'put_oi': put_oi
-        })
-    
-    pcr_df = pd.DataFrame(pcr_by_strike)
-    
-    fig = go.Figure()
-    
-    fig.add_trace(go.Scatter(
-        x=pcr_df['strike'],
-        y=pcr_df['pcr'],
-        mode='lines+markers',
-        name='PCR',
-        line=dict(color='purple', width=2),
-        marker=dict(size=6)
-    ))
+    pcr_df = _pcr_by_strike(df)
+    
+    fig = go.Figure(data=[
+        # WebGL trace, the line and markers render on one canvas instead of SVG nodes
+        dict(
+            type='scattergl',
+            x=pcr_df['strike'],
+            y=pcr_df['pcr'],
+            mode='lines+markers',
+            name='PCR',
+            line=dict(color='purple', width=2),
+            marker=dict(size=6)
+        )
+    ], layout=_BASE_LAYOUT)
     
     # Add PCR = 1 line
     fig.add_hline(
@@ -249,15 +387,36 @@ def plot_pcr_analysis(df):
     fig.update_layout(
         title="Put-Call Ratio by Strike",
         xaxis_title="Strike Price",
-        yaxis_title="PCR (Put OI / Call OI)",
-        template='plotly_white',
-        height=400,
-        hovermode='x unified'
+        yaxis_title="PCR (Put OI / Call OI)"
     )
     
     return fig
 
 
+def update_pcr_analysis(fig, df):
+    """
+    Refresh a figure built by plot_pcr_analysis with new data, in place
+    
+    The PCR = 1 reference line doesn't depend on the data and is kept.
+    
+    Args:
+        fig (plotly.graph_objects.Figure): Figure from plot_pcr_analysis
+        df (pd.DataFrame): Options data
+    
+    Returns:
+        plotly.graph_objects.Figure: The updated figure
+    """
+    pcr_df = _pcr_by_strike(df)
+    
+    with fig.batch_update():
+        fig.data[0].x = pcr_df['strike']
+        fig.data[0].y = pcr_df['pcr']
+    
+    return fig
+
+
+# Keyed on the frame's content, so reruns for unrelated widgets skip the sums
+@st.cache_data(show_spinner=False)
 def create_summary_metrics(gex_df, gamma_levels, spot_price):
     """
     Create summary metrics display
@@ -0,0 +1,80 @@
+"""
+Regression tests for low-priced stock chains with a ₹1 strike step
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from modules import data_fetcher
+
+APP = str(Path(__file__).resolve().parent.parent / 'app.py')
+
+
+def _fake_apis(strikes, spot):
+    """Sensibull/NSE stand-ins serving one synthetic chain"""
+    class Sensibull:
+        def search_token(self, symbol):
+            return 1
+        
+        def get_options_data_with_greeks(self, token, num_look_ups_from_atm=20, expiry_date=None):
+            rng = np.random.default_rng(0)
+            n = len(strikes)
+            df = pd.DataFrame({
+                'strike': strikes,
+                'future_price': spot,
+                'CE.oi': rng.integers(1000, 100000, n),
+                'PE.oi': rng.integers(1000, 100000, n),
+                'CE.implied_volatility': rng.uniform(20, 40, n),
+                'PE.implied_volatility': rng.uniform(20, 40, n),
+                'CE.last_price': rng.uniform(0.05, 10, n),
+                'PE.last_price': rng.uniform(0.05, 10, n),
+            })
+            return df, spot
+    
+    class NSE:
+        def get_options_expiry(self, symbol, is_index=True):
+            return ['30-Dec-2099']
+    
+    return Sensibull, NSE
+
+
+def _run_app(monkeypatch, strikes, spot):
+    Sensibull, NSE = _fake_apis(strikes, spot)
+    monkeypatch.setattr(data_fetcher, 'Sensibull', Sensibull)
+    monkeypatch.setattr(data_fetcher, 'NSE', NSE)
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    
+    at = AppTest.from_file(APP, default_timeout=60)
+    at.run()
+    at.sidebar.radio[0].set_value("Equity Stock").run()
+    at.sidebar.button[0].click().run()
+    assert not at.exception, at.exception
+    return at
+
+
+@pytest.mark.parametrize('spot, atm', [(72.40, 72), (12.35, 12)])
+def test_window_centred_on_spot(monkeypatch, spot, atm):
+    at = _run_app(monkeypatch, np.arange(1, 121), spot)
+    
+    assert any(m.value == f"**ATM Strike:** ₹{atm:,}" for m in at.markdown)
+    
+    at.radio(key='active_view').set_value("📋 Data Table").run()
+    assert not at.exception, at.exception
+    strikes = at.dataframe[0].value['strike']
+    assert strikes.min() >= spot * 0.9
+    assert strikes.max() <= spot * 1.1
+    assert atm in set(strikes)
+
+
+def test_empty_window_warns(monkeypatch):
+    # ₹5 steps leave nothing within ±10% of ₹12.35
+    at = _run_app(monkeypatch, np.arange(5, 125, 5), 12.35)
+    
+    assert any("No strikes within" in w.value for w in at.warning)
+    assert len(at.metric) == 0